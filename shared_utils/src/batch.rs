@@ -14,7 +14,7 @@ use std::sync::atomic::{AtomicBool, Ordering};
 use std::sync::Mutex;
 use std::time::UNIX_EPOCH;
 use tracing::{debug, warn};
-use walkdir::WalkDir;
+use walkdir::{DirEntry, WalkDir};
 
 const PATH_TREE_CACHE_SCHEMA_VERSION: u32 = 1;
 const PATH_TREE_CACHE_DIR: &str = "path_tree";
@@ -358,12 +358,11 @@ fn path_modified_unix_secs(path: &Path) -> u64 {
         .unwrap_or(0)
 }
 
-fn relative_depth_from_root(root: &Path, path: &Path) -> usize {
-    path.strip_prefix(root)
-        .ok()
-        .and_then(Path::parent)
-        .map(|parent| parent.components().count())
-        .unwrap_or(0)
+/// Number of directories between the scan root and a file, from walkdir's own depth
+/// counter (root = 0, its files = 1) instead of re-deriving it per file with
+/// `strip_prefix` + `components().count()`.
+fn relative_depth_from_walk(entry: &DirEntry) -> usize {
+    entry.depth().saturating_sub(1)
 }
 
 fn format_priority_for_image(path: &Path) -> u8 {
@@ -413,12 +412,12 @@ fn sort_cached_image_entries(entries: &mut [CachedImageSortEntry]) {
     entries.sort_by(compare_image_sort_entries);
 }
 
-fn build_cached_image_entry(root: &Path, path: &Path) -> Option<CachedImageSortEntry> {
+fn build_cached_image_entry(path: &Path, relative_depth: usize) -> Option<CachedImageSortEntry> {
     let metadata = fs::metadata(path).ok()?;
     Some(CachedImageSortEntry {
         path: path.to_path_buf(),
         size: metadata.len(),
-        relative_depth: relative_depth_from_root(root, path),
+        relative_depth,
         format_priority: format_priority_for_image(path),
         pixel_count: image_pixel_count(path),
     })
@@ -573,7 +572,9 @@ fn scan_image_tree_snapshot(
                 if entry.file_type().is_file()
                     && crate::common_utils::has_extension(entry.path(), extensions)
                 {
-                    if let Some(file_entry) = build_cached_image_entry(&root, entry.path()) {
+                    if let Some(file_entry) =
+                        build_cached_image_entry(entry.path(), relative_depth_from_walk(&entry))
+                    {
                         files.push(file_entry);
                     }
                 }
@@ -683,13 +684,13 @@ fn sort_cached_video_entries(entries: &mut [CachedVideoSortEntry]) {
     entries.sort_by(compare_video_sort_entries);
 }
 
-fn build_cached_video_entry(root: &Path, path: &Path) -> Option<CachedVideoSortEntry> {
+fn build_cached_video_entry(path: &Path, relative_depth: usize) -> Option<CachedVideoSortEntry> {
     let metadata = fs::metadata(path).ok()?;
     let (pixel_count, duration_secs, frame_rate, estimated_work) = video_probe_priority_data(path);
     Some(CachedVideoSortEntry {
         path: path.to_path_buf(),
         size: metadata.len(),
-        relative_depth: relative_depth_from_root(root, path),
+        relative_depth,
         pixel_count,
         duration_secs,
         frame_rate,
@@ -728,7 +729,9 @@ fn scan_video_tree_snapshot(
                 if entry.file_type().is_file()
                     && crate::common_utils::has_extension(entry.path(), extensions)
                 {
-                    if let Some(file_entry) = build_cached_video_entry(&root, entry.path()) {
+                    if let Some(file_entry) =
+                        build_cached_video_entry(entry.path(), relative_depth_from_walk(&entry))
+                    {
                         files.push(file_entry);
                     }
                 }
@@ -396,6 +396,12 @@ where
         if copy_result.copied > 0 {
             info!("📦 Copied {} unsupported files", copy_result.copied);
         }
+        if copy_result.already_present > 0 {
+            info!(
+                "📦 {} unsupported files already present in output",
+                copy_result.already_present
+            );
+        }
         if copy_result.failed > 0 {
             error!("❌ Failed to copy {} files", copy_result.failed);
         }
@@ -243,6 +243,23 @@ pub fn execute_command_with_logging(cmd: &mut Command) -> Result<Output> {
     Ok(output)
 }
 
+/// Big-endian u32 at `pos` (one slice bounds check instead of one per byte).
+/// Callers have already checked `pos + 4 <= data.len()`.
+#[inline]
+fn be_u32_at(data: &[u8], pos: usize) -> u32 {
+    let mut buf = [0u8; 4];
+    buf.copy_from_slice(&data[pos..pos + 4]);
+    u32::from_be_bytes(buf)
+}
+
+/// Big-endian u64 at `pos`; callers have already checked `pos + 8 <= data.len()`.
+#[inline]
+fn be_u64_at(data: &[u8], pos: usize) -> u64 {
+    let mut buf = [0u8; 8];
+    buf.copy_from_slice(&data[pos..pos + 8]);
+    u64::from_be_bytes(buf)
+}
+
 /// Recursively find a box by type and return its payload (excluding size + type).
 /// Used by ISO BMFF formats (AVIF, HEIC, JXL container).
 ///
@@ -266,8 +283,7 @@ fn find_box_data_recursive_impl<'a>(
 
     let mut pos = 0;
     while pos + 8 <= data.len() {
-        let size =
-            u32::from_be_bytes([data[pos], data[pos + 1], data[pos + 2], data[pos + 3]]) as usize;
+        let size = be_u32_at(data, pos) as usize;
         let current_type = &data[pos + 4..pos + 8];
 
         let (payload_start, next_pos) = if size == 0 {
@@ -279,17 +295,8 @@ fn find_box_data_recursive_impl<'a>(
                 pos += 8;
                 continue;
             }
-            let ext = u64::from_be_bytes([
-                data[pos + 8],
-                data[pos + 9],
-                data[pos + 10],
-                data[pos + 11],
-                data[pos + 12],
-                data[pos + 13],
-                data[pos + 14],
-                data[pos + 15],
-            ]) as usize;
-            if ext < 16 || pos + ext > data.len() {
+            let ext = be_u64_at(data, pos + 8) as usize;
+            if ext < 16 || ext > data.len() - pos {
                 pos += 16;
                 continue;
             }
@@ -353,10 +360,22 @@ fn find_box_data_recursive_impl<'a>(
 
 /// Recursively search for a box type in ISO BMFF data (e.g. "jbrd" inside "JXL " container).
 pub fn find_any_box_recursive(data: &[u8], box_type: &[u8; 4]) -> bool {
+    find_any_box_recursive_impl(data, box_type, 0, 32)
+}
+
+fn find_any_box_recursive_impl(
+    data: &[u8],
+    box_type: &[u8; 4],
+    depth: u32,
+    max_depth: u32,
+) -> bool {
+    if depth >= max_depth {
+        return false;
+    }
+
     let mut pos = 0;
     while pos + 8 <= data.len() {
-        let size =
-            u32::from_be_bytes([data[pos], data[pos + 1], data[pos + 2], data[pos + 3]]) as usize;
+        let size = be_u32_at(data, pos) as usize;
         let current_type = &data[pos + 4..pos + 8];
         if current_type == box_type {
             return true;
@@ -368,17 +387,13 @@ pub fn find_any_box_recursive(data: &[u8], box_type: &[u8; 4]) -> bool {
                 pos += 8;
                 continue;
             }
-            let ext = u64::from_be_bytes([
-                data[pos + 8],
-                data[pos + 9],
-                data[pos + 10],
-                data[pos + 11],
-                data[pos + 12],
-                data[pos + 13],
-                data[pos + 14],
-                data[pos + 15],
-            ]) as usize;
-            (pos + 16, (pos + ext).min(data.len()))
+            let ext = be_u64_at(data, pos + 8) as usize;
+            if ext < 16 {
+                // Extended size smaller than its own header: would never advance pos.
+                pos += 16;
+                continue;
+            }
+            (pos + 16, pos.saturating_add(ext).min(data.len()))
         } else if size < 8 {
             pos += 8;
             continue;
@@ -386,7 +401,12 @@ pub fn find_any_box_recursive(data: &[u8], box_type: &[u8; 4]) -> bool {
             (pos + 8, (pos + size).min(data.len()))
         };
         if next_pos > payload_start
-            && find_any_box_recursive(&data[payload_start..next_pos], box_type)
+            && find_any_box_recursive_impl(
+                &data[payload_start..next_pos],
+                box_type,
+                depth + 1,
+                max_depth,
+            )
         {
             return true;
         }
@@ -538,6 +558,51 @@ mod tests {
         assert_eq!(fs::read_to_string(&dest).unwrap(), "test content");
     }
 
+    #[test]
+    fn test_find_box_data_recursive_extended_size() {
+        let mut data: Vec<u8> = vec![0x00, 0x00, 0x00, 0x0C];
+        data.extend_from_slice(b"ftypjxl ");
+        // size=1 → 64-bit size follows the type
+        data.extend_from_slice(&[0x00, 0x00, 0x00, 0x01]);
+        data.extend_from_slice(b"jxlc");
+        data.extend_from_slice(&19u64.to_be_bytes());
+        data.extend_from_slice(&[0xFF, 0x0A, 0x42]);
+
+        assert_eq!(
+            find_box_data_recursive(&data, b"jxlc"),
+            Some(&[0xFF, 0x0A, 0x42][..])
+        );
+        assert!(find_any_box_recursive(&data, b"jxlc"));
+        assert!(!find_any_box_recursive(&data, b"jbrd"));
+    }
+
+    #[test]
+    fn test_find_any_box_recursive_malformed_input_terminates() {
+        // Extended size of 0 used to leave pos unchanged and loop forever.
+        let mut data: Vec<u8> = vec![0x00, 0x00, 0x00, 0x01];
+        data.extend_from_slice(b"free");
+        data.extend_from_slice(&0u64.to_be_bytes());
+        data.extend_from_slice(&[0u8; 8]);
+        assert!(!find_any_box_recursive(&data, b"jbrd"));
+        assert_eq!(find_box_data_recursive(&data, b"jbrd"), None);
+
+        // Huge extended size must not overflow pos + ext.
+        let mut data: Vec<u8> = vec![0x00, 0x00, 0x00, 0x01];
+        data.extend_from_slice(b"free");
+        data.extend_from_slice(&u64::MAX.to_be_bytes());
+        assert!(!find_any_box_recursive(&data, b"jbrd"));
+        assert_eq!(find_box_data_recursive(&data, b"jbrd"), None);
+
+        // Deeply nested headers are cut off at the depth limit instead of overflowing the stack.
+        const LEVELS: usize = 100_000;
+        let mut data = Vec::with_capacity(LEVELS * 8);
+        for i in 0..LEVELS {
+            data.extend_from_slice(&(((LEVELS - i) * 8) as u32).to_be_bytes());
+            data.extend_from_slice(b"moov");
+        }
+        assert!(!find_any_box_recursive(&data, b"jbrd"));
+    }
+
     #[test]
     fn test_normalize_path_string() {
         assert_eq!(normalize_path_string("C:\\Users\\test"), "C:/Users/test");
@@ -14,6 +14,9 @@
 //! - 所有失败都记录到日志和错误列表
 //! - 响亮报错，不静默失败
 
+use crate::common_utils::has_extension;
+use rayon::prelude::*;
+use std::collections::{BTreeSet, HashMap};
 use std::path::{Path, PathBuf};
 use tracing::{debug, error, info, warn};
 use walkdir::WalkDir;
@@ -49,6 +52,8 @@ pub struct CopyResult {
     pub total_files: usize,
     pub copied: usize,
     pub skipped: usize,
+    /// Destination already held a finished copy from an earlier run; not re-copied.
+    pub already_present: usize,
     pub failed: usize,
     pub errors: Vec<(PathBuf, String, String)>,
 }
@@ -59,6 +64,7 @@ impl CopyResult {
             total_files: 0,
             copied: 0,
             skipped: 0,
+            already_present: 0,
             failed: 0,
             errors: Vec::new(),
         }
@@ -72,12 +78,6 @@ impl Default for CopyResult {
 }
 
 fn should_copy_file(path: &Path) -> bool {
-    let ext = path
-        .extension()
-        .and_then(|e| e.to_str())
-        .map(|e| e.to_lowercase())
-        .unwrap_or_default();
-
     if path
         .file_name()
         .and_then(|n| n.to_str())
@@ -87,15 +87,15 @@ fn should_copy_file(path: &Path) -> bool {
         return false;
     }
 
-    if SUPPORTED_IMAGE_EXTENSIONS.contains(&ext.as_str()) {
+    if has_extension(path, SUPPORTED_IMAGE_EXTENSIONS) {
         return false;
     }
 
-    if SUPPORTED_VIDEO_EXTENSIONS.contains(&ext.as_str()) {
+    if has_extension(path, SUPPORTED_VIDEO_EXTENSIONS) {
         return false;
     }
 
-    if SIDECAR_EXTENSIONS.contains(&ext.as_str()) {
+    if has_extension(path, SIDECAR_EXTENSIONS) {
         return false;
     }
 
@@ -112,47 +112,15 @@ pub fn copy_unsupported_files(input_dir: &Path, output_dir: &Path, recursive: bo
         "Starting batch file copy operation"
     );
 
+    // Single traversal: collect copy jobs first, then start the heartbeat when the
+    // job count is known (no separate pre-scan walk over the whole tree).
     let walker = if recursive {
         WalkDir::new(input_dir).follow_links(true)
     } else {
         WalkDir::new(input_dir).max_depth(1)
     };
 
-    let mut total_files = 0usize;
-    for entry in walker.into_iter() {
-        match entry {
-            Ok(entry) => {
-                if entry.file_type().is_file() && should_copy_file(entry.path()) {
-                    total_files += 1;
-                }
-            }
-            Err(err) => {
-                warn!(
-                    input_dir = %input_dir.display(),
-                    error = %err,
-                    "Failed to inspect directory entry during pre-scan"
-                );
-            }
-        }
-    }
-
-    debug!(total_files = total_files, "Pre-scan completed");
-
-    let _heartbeat = if total_files > 10 {
-        Some(crate::universal_heartbeat::HeartbeatGuard::new(
-            crate::universal_heartbeat::HeartbeatConfig::medium("Batch File Copy")
-                .with_info(format!("{} files", total_files)),
-        ))
-    } else {
-        None
-    };
-
-    let walker = if recursive {
-        WalkDir::new(input_dir).follow_links(true)
-    } else {
-        WalkDir::new(input_dir).max_depth(1)
-    };
-
+    let mut jobs: Vec<CopyJob> = Vec::new();
     for entry in walker.into_iter() {
         let entry = match entry {
             Ok(entry) => entry,
@@ -167,8 +135,7 @@ pub fn copy_unsupported_files(input_dir: &Path, output_dir: &Path, recursive: bo
                     error = %err,
                     "Directory traversal failed during batch copy"
                 );
-                result.failed += 1;
-                result.errors.push((path, error_msg, "walkdir".to_string()));
+                jobs.push(CopyJob::Failed(path, error_msg, "walkdir".to_string()));
                 continue;
             }
         };
@@ -196,90 +163,82 @@ pub fn copy_unsupported_files(input_dir: &Path, output_dir: &Path, recursive: bo
                     "Path computation failed"
                 );
                 eprintln!("❌ Path error for {}: {}", path.display(), error_msg);
-                result.failed += 1;
-                result
-                    .errors
-                    .push((path.to_path_buf(), error_msg, "compute_path".to_string()));
+                jobs.push(CopyJob::Failed(
+                    path.to_path_buf(),
+                    error_msg,
+                    "compute_path".to_string(),
+                ));
                 continue;
             }
         };
 
-        let dest = output_dir.join(rel_path);
+        jobs.push(CopyJob::Copy {
+            src: path.to_path_buf(),
+            dest: output_dir.join(rel_path),
+        });
+    }
 
-        if let Some(parent) = dest.parent() {
-            if let Err(e) = std::fs::create_dir_all(parent) {
-                let error_msg = format!("Failed to create directory: {}", e);
-                error!(
-                    file = %path.display(),
-                    dest_dir = %parent.display(),
-                    error = %e,
-                    "Directory creation failed"
-                );
-                eprintln!(
-                    "❌ Failed to create directory for {}: {}",
-                    path.display(),
-                    error_msg
-                );
+    let copy_count = jobs
+        .iter()
+        .filter(|job| matches!(job, CopyJob::Copy { .. }))
+        .count();
+    debug!(total_files = copy_count, "Scan completed");
+
+    let _heartbeat = if copy_count > 10 {
+        Some(crate::universal_heartbeat::HeartbeatGuard::new(
+            crate::universal_heartbeat::HeartbeatConfig::medium("Batch File Copy")
+                .with_info(format!("{} files", copy_count)),
+        ))
+    } else {
+        None
+    };
+
+    // One create_dir_all per distinct destination directory rather than per file;
+    // failures are kept so every file under that directory still reports its own error.
+    let dest_dirs: BTreeSet<&Path> = jobs
+        .iter()
+        .filter_map(|job| match job {
+            CopyJob::Copy { dest, .. } => dest.parent(),
+            CopyJob::Failed(..) => None,
+        })
+        .collect();
+    let dir_errors: HashMap<&Path, std::io::Error> = dest_dirs
+        .into_iter()
+        .filter_map(|dir| std::fs::create_dir_all(dir).err().map(|e| (dir, e)))
+        .collect();
+
+    // Only the byte copy runs in parallel. Metadata and XMP merging stay serial below:
+    // the XMP fallback temporarily renames the destination within the output directory
+    // (check-then-rename), which would race with sibling copies into that directory.
+    let outcomes: Vec<Option<CopyOutcome>> = jobs
+        .par_iter()
+        .map(|job| match job {
+            CopyJob::Copy { src, dest } => Some(
+                match dest.parent().and_then(|dir| dir_errors.get_key_value(dir)) {
+                    Some((dir, e)) => create_dir_failure(src, dir, e),
+                    None => copy_data(src, dest),
+                },
+            ),
+            CopyJob::Failed(..) => None,
+        })
+        .collect();
+
+    // Fold in traversal order so `errors` lists failures in the order files were visited.
+    for (job, outcome) in jobs.into_iter().zip(outcomes) {
+        match (job, outcome) {
+            (CopyJob::Failed(path, error_msg, kind), _)
+            | (_, Some(CopyOutcome::Failed(path, error_msg, kind))) => {
                 result.failed += 1;
-                result
-                    .errors
-                    .push((path.to_path_buf(), error_msg, "create_dir".to_string()));
-                continue;
+                result.errors.push((path, error_msg, kind));
             }
-        }
-
-        match std::fs::copy(path, &dest) {
-            Ok(_) => {
+            (CopyJob::Copy { src, dest }, Some(CopyOutcome::Copied)) => {
+                finish_copy(&src, &dest);
                 result.copied += 1;
-
-                crate::copy_metadata(path, &dest);
-
-                let ext = path
-                    .extension()
-                    .and_then(|e| e.to_str())
-                    .unwrap_or("unknown");
-                println!("📦 Copied unsupported file (.{}): {}", ext, path.display());
-
-                debug!(
-                    source = %path.display(),
-                    dest = %dest.display(),
-                    extension = ext,
-                    "File copied successfully"
-                );
-
-                match crate::merge_xmp_for_copied_file(path, &dest) {
-                    Ok(true) => {
-                        debug!(file = %path.display(), "XMP merged successfully");
-                    }
-                    Ok(false) => {
-                        debug!(file = %path.display(), "No XMP sidecar found");
-                    }
-                    Err(e) => {
-                        warn!(
-                            file = %path.display(),
-                            error = %e,
-                            "XMP merge failed, trying to copy sidecar"
-                        );
-                        println!("⚠️ XMP merge failed ({}), trying to copy sidecar...", e);
-                        copy_xmp_sidecar_if_exists(path, &dest);
-                    }
-                }
             }
-            Err(e) => {
-                let error_msg = format!("Copy failed: {}", e);
-                error!(
-                    source = %path.display(),
-                    dest = %dest.display(),
-                    error = %e,
-                    error_kind = ?e.kind(),
-                    "File copy operation failed"
-                );
-                eprintln!("❌ Failed to copy {}: {}", path.display(), e);
-                result.failed += 1;
-                result
-                    .errors
-                    .push((path.to_path_buf(), error_msg, "copy_file".to_string()));
+            (CopyJob::Copy { .. }, Some(CopyOutcome::AlreadyPresent)) => {
+                result.already_present += 1
             }
+            (CopyJob::Copy { .. }, None) => unreachable!("every copy job has an outcome"),
         }
     }
 
@@ -287,6 +246,7 @@ pub fn copy_unsupported_files(input_dir: &Path, output_dir: &Path, recursive: bo
         total = result.total_files,
         copied = result.copied,
         skipped = result.skipped,
+        already_present = result.already_present,
         failed = result.failed,
         "Batch file copy operation completed"
     );
@@ -305,6 +265,119 @@ pub fn copy_unsupported_files(input_dir: &Path, output_dir: &Path, recursive: bo
     result
 }
 
+/// One traversal result. Walk/path failures stay in the list so the final fold can
+/// report every error in the order the tree was visited.
+enum CopyJob {
+    Copy { src: PathBuf, dest: PathBuf },
+    Failed(PathBuf, String, String),
+}
+
+/// Result of copying one file, folded into [`CopyResult`] after the parallel pass.
+enum CopyOutcome {
+    Copied,
+    AlreadyPresent,
+    Failed(PathBuf, String, String),
+}
+
+fn create_dir_failure(path: &Path, dest_dir: &Path, e: &std::io::Error) -> CopyOutcome {
+    let error_msg = format!("Failed to create directory: {}", e);
+    error!(
+        file = %path.display(),
+        dest_dir = %dest_dir.display(),
+        error = %e,
+        "Directory creation failed"
+    );
+    eprintln!(
+        "❌ Failed to create directory for {}: {}",
+        path.display(),
+        error_msg
+    );
+    CopyOutcome::Failed(path.to_path_buf(), error_msg, "create_dir".to_string())
+}
+
+/// Destination left by an earlier (possibly interrupted) run is treated as finished
+/// when it has the source's size and mtime. `copy_metadata` stamps the mtime before
+/// the XMP sidecar merge runs, so a source with a sidecar is always re-copied: an
+/// aborted or failed merge would otherwise pass this check and never be retried.
+/// The sidecar lookup (possibly a directory scan) only runs once size and mtime match.
+fn is_already_copied(src: &Path, dest: &Path) -> bool {
+    let (Ok(src_meta), Ok(dest_meta)) = (std::fs::metadata(src), std::fs::metadata(dest)) else {
+        return false;
+    };
+    if src_meta.len() != dest_meta.len() {
+        return false;
+    }
+    let same_mtime = match (src_meta.modified(), dest_meta.modified()) {
+        (Ok(src_mtime), Ok(dest_mtime)) => src_mtime == dest_mtime,
+        _ => false,
+    };
+    same_mtime && crate::metadata::find_xmp_sidecar(src).is_none()
+}
+
+/// Copy one file's bytes; its destination directory already exists.
+fn copy_data(path: &Path, dest: &Path) -> CopyOutcome {
+    if is_already_copied(path, dest) {
+        debug!(
+            source = %path.display(),
+            dest = %dest.display(),
+            "Destination already up to date, skipping copy"
+        );
+        return CopyOutcome::AlreadyPresent;
+    }
+
+    match std::fs::copy(path, dest) {
+        Ok(_) => CopyOutcome::Copied,
+        Err(e) => {
+            let error_msg = format!("Copy failed: {}", e);
+            error!(
+                source = %path.display(),
+                dest = %dest.display(),
+                error = %e,
+                error_kind = ?e.kind(),
+                "File copy operation failed"
+            );
+            eprintln!("❌ Failed to copy {}: {}", path.display(), e);
+            CopyOutcome::Failed(path.to_path_buf(), error_msg, "copy_file".to_string())
+        }
+    }
+}
+
+/// Metadata and XMP handling for a freshly copied file. Must run serially (see caller).
+fn finish_copy(path: &Path, dest: &Path) {
+    crate::copy_metadata(path, dest);
+
+    let ext = path
+        .extension()
+        .and_then(|e| e.to_str())
+        .unwrap_or("unknown");
+    println!("📦 Copied unsupported file (.{}): {}", ext, path.display());
+
+    debug!(
+        source = %path.display(),
+        dest = %dest.display(),
+        extension = ext,
+        "File copied successfully"
+    );
+
+    match crate::merge_xmp_for_copied_file(path, dest) {
+        Ok(true) => {
+            debug!(file = %path.display(), "XMP merged successfully");
+        }
+        Ok(false) => {
+            debug!(file = %path.display(), "No XMP sidecar found");
+        }
+        Err(e) => {
+            warn!(
+                file = %path.display(),
+                error = %e,
+                "XMP merge failed, trying to copy sidecar"
+            );
+            println!("⚠️ XMP merge failed ({}), trying to copy sidecar...", e);
+            copy_xmp_sidecar_if_exists(path, dest);
+        }
+    }
+}
+
 fn copy_xmp_sidecar_if_exists(source: &Path, dest: &Path) {
     let source_str = source.to_string_lossy();
     let dest_str = dest.to_string_lossy();
@@ -315,39 +388,40 @@ fn copy_xmp_sidecar_if_exists(source: &Path, dest: &Path) {
         source.with_extension("xmp").to_string_lossy().to_string(),
     ];
 
+    let xmp_dest = format!("{}.xmp", dest_str);
+
+    // Attempt the copy directly: a missing candidate surfaces as NotFound from the
+    // source open, so no separate exists() stat is needed per pattern.
     for xmp_source in &xmp_patterns {
         let xmp_path = Path::new(xmp_source);
-        if xmp_path.exists() {
-            let xmp_dest = format!("{}.xmp", dest_str);
-
-            match std::fs::copy(xmp_path, &xmp_dest) {
-                Ok(_) => {
-                    crate::copy_metadata(xmp_path, Path::new(&xmp_dest));
-                    println!("   📋 Copied XMP sidecar: {}", xmp_path.display());
-
-                    debug!(
-                        source = %xmp_path.display(),
-                        dest = %xmp_dest,
-                        "XMP sidecar copied successfully"
-                    );
-                }
-                Err(e) => {
-                    error!(
-                        source = %xmp_path.display(),
-                        dest = %xmp_dest,
-                        error = %e,
-                        error_kind = ?e.kind(),
-                        "Failed to copy XMP sidecar"
-                    );
-                    eprintln!(
-                        "⚠️ Failed to copy XMP sidecar {}: {}",
-                        xmp_path.display(),
-                        e
-                    );
-                }
+        match std::fs::copy(xmp_path, &xmp_dest) {
+            Ok(_) => {
+                crate::copy_metadata(xmp_path, Path::new(&xmp_dest));
+                println!("   📋 Copied XMP sidecar: {}", xmp_path.display());
+
+                debug!(
+                    source = %xmp_path.display(),
+                    dest = %xmp_dest,
+                    "XMP sidecar copied successfully"
+                );
+            }
+            Err(e) if e.kind() == std::io::ErrorKind::NotFound => continue,
+            Err(e) => {
+                error!(
+                    source = %xmp_path.display(),
+                    dest = %xmp_dest,
+                    error = %e,
+                    error_kind = ?e.kind(),
+                    "Failed to copy XMP sidecar"
+                );
+                eprintln!(
+                    "⚠️ Failed to copy XMP sidecar {}: {}",
+                    xmp_path.display(),
+                    e
+                );
             }
-            return;
         }
+        return;
     }
 
     debug!(
@@ -416,17 +490,11 @@ pub fn count_files(dir: &Path, recursive: bool) -> FileStats {
 
         stats.total += 1;
 
-        let ext = path
-            .extension()
-            .and_then(|e| e.to_str())
-            .map(|e| e.to_lowercase())
-            .unwrap_or_default();
-
-        if SUPPORTED_IMAGE_EXTENSIONS.contains(&ext.as_str()) {
+        if has_extension(path, SUPPORTED_IMAGE_EXTENSIONS) {
             stats.images += 1;
-        } else if SUPPORTED_VIDEO_EXTENSIONS.contains(&ext.as_str()) {
+        } else if has_extension(path, SUPPORTED_VIDEO_EXTENSIONS) {
             stats.videos += 1;
-        } else if SIDECAR_EXTENSIONS.contains(&ext.as_str()) {
+        } else if has_extension(path, SIDECAR_EXTENSIONS) {
             stats.sidecars += 1;
         } else {
             stats.others += 1;
@@ -507,4 +575,136 @@ mod tests {
 
         assert!(!should_copy_file(Path::new(".DS_Store")));
     }
+
+    #[test]
+    fn test_is_already_copied_requires_size_and_mtime() {
+        let temp = tempfile::TempDir::new().unwrap();
+        let src = temp.path().join("doc.pdf");
+        let dest = temp.path().join("out.pdf");
+        std::fs::write(&src, b"complete contents").unwrap();
+        let src_mtime =
+            filetime::FileTime::from_last_modification_time(&std::fs::metadata(&src).unwrap());
+
+        assert!(!is_already_copied(&src, &dest), "missing destination");
+
+        std::fs::write(&dest, b"partial").unwrap();
+        filetime::set_file_mtime(&dest, src_mtime).unwrap();
+        assert!(!is_already_copied(&src, &dest), "size mismatch");
+
+        std::fs::write(&dest, b"complete contents").unwrap();
+        filetime::set_file_mtime(&dest, filetime::FileTime::from_unix_time(1, 0)).unwrap();
+        assert!(!is_already_copied(&src, &dest), "mtime mismatch");
+
+        filetime::set_file_mtime(&dest, src_mtime).unwrap();
+        assert!(is_already_copied(&src, &dest));
+    }
+
+    #[test]
+    fn test_is_already_copied_recopies_when_source_has_xmp_sidecar() {
+        let src_dir = tempfile::TempDir::new().unwrap();
+        let dest_dir = tempfile::TempDir::new().unwrap();
+        let src = src_dir.path().join("doc.pdf");
+        let dest = dest_dir.path().join("doc.pdf");
+        std::fs::write(&src, b"complete contents").unwrap();
+        std::fs::write(&dest, b"complete contents").unwrap();
+        let src_mtime =
+            filetime::FileTime::from_last_modification_time(&std::fs::metadata(&src).unwrap());
+        filetime::set_file_mtime(&dest, src_mtime).unwrap();
+        assert!(is_already_copied(&src, &dest));
+
+        std::fs::write(src_dir.path().join("doc.pdf.xmp"), b"<x:xmpmeta/>").unwrap();
+        assert!(
+            !is_already_copied(&src, &dest),
+            "XMP merge may not have completed"
+        );
+    }
+
+    #[test]
+    fn test_copy_unsupported_files_first_run_and_rerun() {
+        let input = tempfile::TempDir::new().unwrap();
+        let output = tempfile::TempDir::new().unwrap();
+        std::fs::create_dir(input.path().join("sub")).unwrap();
+        for (name, contents) in [
+            ("a.pdf", &b"pdf"[..]),
+            ("b.txt", b"text"),
+            ("sub/c.psd", b"layers"),
+            ("photo.jpg", b"jpeg"),
+            ("photo.xmp", b"<x:xmpmeta/>"),
+            (".hidden", b"dot"),
+        ] {
+            std::fs::write(input.path().join(name), contents).unwrap();
+        }
+
+        let counts = |r: &CopyResult| {
+            (
+                r.total_files,
+                r.copied,
+                r.skipped,
+                r.already_present,
+                r.failed,
+            )
+        };
+
+        let first = copy_unsupported_files(input.path(), output.path(), true);
+        assert_eq!(counts(&first), (6, 3, 3, 0, 0));
+        assert!(first.errors.is_empty());
+        assert_eq!(
+            std::fs::read(output.path().join("sub/c.psd")).unwrap(),
+            b"layers"
+        );
+        assert!(!output.path().join("photo.jpg").exists());
+
+        let rerun = copy_unsupported_files(input.path(), output.path(), true);
+        assert_eq!(counts(&rerun), (6, 0, 3, 3, 0));
+        assert!(rerun.errors.is_empty());
+    }
+
+    #[test]
+    fn test_copy_unsupported_files_errors_in_traversal_order() {
+        let input = tempfile::TempDir::new().unwrap();
+        let output = tempfile::TempDir::new().unwrap();
+        std::fs::create_dir(input.path().join("sub")).unwrap();
+        for name in ["a.txt", "b.txt", "sub/c.txt", "sub/d.txt", "z.txt"] {
+            std::fs::write(input.path().join(name), name).unwrap();
+        }
+        // Broken link: walkdir error when following links.
+        #[cfg(unix)]
+        std::os::unix::fs::symlink(input.path().join("missing"), input.path().join("link.txt"))
+            .unwrap();
+        // "sub" is a file, so its directory cannot be created; "b.txt" is a directory.
+        std::fs::write(output.path().join("sub"), b"").unwrap();
+        std::fs::create_dir(output.path().join("b.txt")).unwrap();
+
+        let result = copy_unsupported_files(input.path(), output.path(), true);
+
+        let expected: Vec<(PathBuf, &str)> = WalkDir::new(input.path())
+            .follow_links(true)
+            .into_iter()
+            .filter_map(|entry| match entry {
+                Ok(entry) => {
+                    let rel = entry.path().strip_prefix(input.path()).unwrap();
+                    let kind = if rel.starts_with("sub") && entry.file_type().is_file() {
+                        "create_dir"
+                    } else if rel == Path::new("b.txt") {
+                        "copy_file"
+                    } else {
+                        return None;
+                    };
+                    Some((entry.path().to_path_buf(), kind))
+                }
+                Err(err) => Some((err.path().unwrap().to_path_buf(), "walkdir")),
+            })
+            .collect();
+        let actual: Vec<(PathBuf, &str)> = result
+            .errors
+            .iter()
+            .map(|(path, _, kind)| (path.clone(), kind.as_str()))
+            .collect();
+
+        assert_eq!(actual, expected);
+        assert_eq!(result.failed, expected.len());
+        assert_eq!(result.copied, 2);
+        assert!(output.path().join("a.txt").is_file());
+        assert!(output.path().join("z.txt").is_file());
+    }
 }
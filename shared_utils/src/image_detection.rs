@@ -2571,11 +2571,8 @@ fn find_jp2_wavelets(cs: &[u8]) -> (Option<u8>, Vec<(u16, u8)>) {
 
 /// Detect JXL (JPEG XL) lossless encoding — multi-dimension analysis.
 fn detect_jxl_compression(path: &Path) -> Result<CompressionType> {
-    crate::common_utils::validate_file_size_limit(path, 512 * 1024 * 1024)
-        .map_err(|e| ImgQualityError::AnalysisError(e.to_string()))?;
-
-    let data = std::fs::read(path)?;
-    if crate::image_formats::jxl::is_lossless_from_bytes(&data, path)? {
+    // No size limit: only box headers and a bounded codestream prefix are read.
+    if crate::image_formats::jxl::is_lossless_from_file(path)? {
         Ok(CompressionType::Lossless)
     } else {
         Ok(CompressionType::Lossy)
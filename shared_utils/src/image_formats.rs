@@ -590,6 +590,7 @@ pub mod jxl {
     use crate::common_utils::{find_any_box_recursive, find_box_data_recursive};
     use crate::img_errors::{ImgQualityError, Result};
     use std::fs;
+    use std::io::{Read, Seek, SeekFrom};
     use std::path::Path;
 
     /// Detect JXL (JPEG XL) lossless encoding — multi-dimension analysis.
@@ -612,10 +613,160 @@ pub mod jxl {
         let codestream: Option<&[u8]> = if is_naked {
             Some(data)
         } else {
-            find_box_data_recursive(data, b"jxlc")
-                .or_else(|| find_box_data_recursive(data, b"jxlp"))
+            container_codestream(data)
         };
 
+        lossless_from_codestream(codestream, path)
+    }
+
+    /// Bytes of codestream read for header parsing. SizeHeader + ImageMetadata up to
+    /// `xyb_encoded` take well under this.
+    const CODESTREAM_HEADER_PROBE: u64 = 4096;
+
+    /// [`is_lossless_from_bytes`], read straight from the file.
+    ///
+    /// A file no larger than [`CODESTREAM_HEADER_PROBE`] is read whole and given to
+    /// [`is_lossless_from_bytes`]. For a larger container, top-level boxes are walked by
+    /// header only (seeking over payloads) with the same rules as the bytes path,
+    /// including how malformed sizes are skipped, and only the first
+    /// [`CODESTREAM_HEADER_PROBE`] bytes of the codestream are read. A large JXL is
+    /// never loaded into memory just to inspect its header.
+    ///
+    /// Unlike the bytes path, boxes nested inside other boxes are not searched: the
+    /// bytes path also descends into every payload for `jbrd` (codestream bytes
+    /// included) and into ISO-BMFF containers such as `meta` for `jxlc`/`jxlp`, which
+    /// would mean reading those payloads. JXL puts all three at the top level.
+    pub fn is_lossless_from_file(path: &Path) -> Result<bool> {
+        let mut file = fs::File::open(path)?;
+        let file_len = file.metadata()?.len();
+        let mut head = Vec::with_capacity(CODESTREAM_HEADER_PROBE as usize);
+        (&mut file)
+            .take(CODESTREAM_HEADER_PROBE)
+            .read_to_end(&mut head)?;
+        // Whole file already in memory, or a naked codestream whose header is in `head`
+        if head.len() as u64 >= file_len || head.len() < 4 || (head[0] == 0xFF && head[1] == 0x0A) {
+            return is_lossless_from_bytes(&head, path);
+        }
+
+        // Pass 1: headers only. Record where the codestream starts instead of reading
+        // it mid-walk, so a jbrd hit never touches the payload.
+        if file_has_top_level_box(&mut file, file_len, b"jbrd")? {
+            return Ok(true);
+        }
+        // container_codestream: the first jxlc, else the first jxlp minus its part index
+        let codestream_at = match file_box_payload(&mut file, file_len, b"jxlc")? {
+            Some(jxlc) => Some(jxlc),
+            None => file_box_payload(&mut file, file_len, b"jxlp")?
+                .and_then(|(offset, len)| len.checked_sub(4).map(|len| (offset + 4, len))),
+        };
+
+        // Pass 2: one bounded read of the codestream header, or none at all when it
+        // starts inside the probe bytes read above (the usual layout: a few small
+        // boxes, then jxlc) and that prefix is enough to parse it.
+        let Some((offset, len)) = codestream_at else {
+            return lossless_from_codestream(None, path);
+        };
+        let want = len.min(CODESTREAM_HEADER_PROBE);
+        let end = offset + want;
+        if let Some(prefix) = head.get(offset as usize..(end as usize).min(head.len())) {
+            if prefix.len() as u64 == want || parse_jxl_xyb_encoded(prefix).is_some() {
+                return lossless_from_codestream(Some(prefix), path);
+            }
+        }
+        let mut cs = Vec::with_capacity(want as usize);
+        file.seek(SeekFrom::Start(offset))?;
+        (&mut file).take(want).read_to_end(&mut cs)?;
+        lossless_from_codestream(Some(&cs), path)
+    }
+
+    fn read_at<const N: usize>(file: &mut fs::File, pos: u64) -> std::io::Result<[u8; N]> {
+        let mut buf = [0u8; N];
+        file.seek(SeekFrom::Start(pos))?;
+        file.read_exact(&mut buf)?;
+        Ok(buf)
+    }
+
+    /// `find_any_box_recursive` over the file's top-level boxes, same skip rules.
+    fn file_has_top_level_box(
+        file: &mut fs::File,
+        file_len: u64,
+        box_type: &[u8; 4],
+    ) -> std::io::Result<bool> {
+        let mut pos = 0u64;
+        while pos + 8 <= file_len {
+            let hdr: [u8; 8] = read_at(file, pos)?;
+            if &hdr[4..] == box_type {
+                return Ok(true);
+            }
+            pos = match u32::from_be_bytes([hdr[0], hdr[1], hdr[2], hdr[3]]) {
+                0 => break,
+                1 => {
+                    if pos + 16 > file_len {
+                        pos += 8;
+                        continue;
+                    }
+                    let ext = u64::from_be_bytes(read_at(file, pos + 8)?);
+                    if ext < 16 {
+                        pos += 16;
+                        continue;
+                    }
+                    pos.saturating_add(ext).min(file_len)
+                }
+                n if n < 8 => pos + 8,
+                n => (pos + u64::from(n)).min(file_len),
+            };
+        }
+        Ok(false)
+    }
+
+    /// `find_box_data_recursive` over the file's top-level boxes, same skip rules:
+    /// (offset, len) of the first `box_type` payload, `None` if absent or empty.
+    fn file_box_payload(
+        file: &mut fs::File,
+        file_len: u64,
+        box_type: &[u8; 4],
+    ) -> std::io::Result<Option<(u64, u64)>> {
+        let mut pos = 0u64;
+        while pos + 8 <= file_len {
+            let hdr: [u8; 8] = read_at(file, pos)?;
+            let (payload_start, next_pos) =
+                match u32::from_be_bytes([hdr[0], hdr[1], hdr[2], hdr[3]]) {
+                    0 => (pos + 8, file_len), // extends to end of file
+                    1 => {
+                        if pos + 16 > file_len {
+                            pos += 8;
+                            continue;
+                        }
+                        let ext = u64::from_be_bytes(read_at(file, pos + 8)?);
+                        if ext < 16 || ext > file_len - pos {
+                            pos += 16;
+                            continue;
+                        }
+                        (pos + 16, pos + ext)
+                    }
+                    n if n < 8 => {
+                        pos += 8;
+                        continue;
+                    }
+                    n => {
+                        let n = u64::from(n);
+                        if pos + n > file_len {
+                            break;
+                        }
+                        (pos + 8, pos + n)
+                    }
+                };
+            if &hdr[4..] == box_type {
+                return Ok(
+                    (payload_start < next_pos).then(|| (payload_start, next_pos - payload_start))
+                );
+            }
+            pos = next_pos;
+        }
+        Ok(None)
+    }
+
+    fn lossless_from_codestream(codestream: Option<&[u8]>, path: &Path) -> Result<bool> {
         if let Some(cs) = codestream {
             match parse_jxl_xyb_encoded(cs) {
                 Some(true) => return Ok(false), // xyb_encoded=true -> lossy
@@ -630,6 +781,19 @@ pub mod jxl {
         )))
     }
 
+    /// Borrow the start of the codestream from a JXL container without copying.
+    ///
+    /// A `jxlc` box holds the whole codestream. Otherwise the codestream is split
+    /// across `jxlp` boxes, each prefixed with a 4-byte part index (high bit marks the
+    /// last part). Only the header is needed here, and it lives in the first part, so
+    /// the parts are never concatenated.
+    fn container_codestream(data: &[u8]) -> Option<&[u8]> {
+        if let Some(cs) = find_box_data_recursive(data, b"jxlc") {
+            return Some(cs);
+        }
+        find_box_data_recursive(data, b"jxlp").and_then(|part| part.get(4..))
+    }
+
     /// Minimal bit reader for parsing JXL codestream headers.
     struct JxlBitReader<'a> {
         data: &'a [u8],
@@ -780,7 +944,6 @@ pub mod jxl {
 
     pub fn verify_signature(path: &Path) -> bool {
         if let Ok(mut file) = fs::File::open(path) {
-            use std::io::Read;
             let mut sig = [0u8; 2];
             if file.read_exact(&mut sig).is_ok() {
                 return sig == [0xFF, 0x0A] || sig == [0x00, 0x00];
@@ -929,6 +1092,144 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_jxl_jxlp_part_index_is_skipped() {
+        // Signature box + ftyp + one jxlp part: index 0x80000000 (last), then a
+        // codestream header with small size, all_default=0, xyb_encoded=0 (lossless).
+        let mut data: Vec<u8> = vec![0x00, 0x00, 0x00, 0x0C];
+        data.extend_from_slice(b"JXL \r\n\x87\n");
+        data.extend_from_slice(&[0x00, 0x00, 0x00, 0x14]);
+        data.extend_from_slice(b"ftypjxl \0\0\0\0jxl ");
+        data.extend_from_slice(&[0x00, 0x00, 0x00, 0x11]);
+        data.extend_from_slice(b"jxlp");
+        data.extend_from_slice(&[0x80, 0x00, 0x00, 0x00, 0xFF, 0x0A, 0x41, 0x00, 0x00]);
+
+        let lossless = jxl::is_lossless_from_bytes(&data, std::path::Path::new("part.jxl"))
+            .expect("jxlp codestream header should parse");
+        assert!(lossless, "xyb_encoded=0 in a jxlp part should be lossless");
+    }
+
+    #[test]
+    fn test_jxl_is_lossless_from_file_matches_bytes() {
+        // Signature + ftyp, a large skipped box, then jxlc with an all_default (lossy) header.
+        let mut data: Vec<u8> = vec![0x00, 0x00, 0x00, 0x0C];
+        data.extend_from_slice(b"JXL \r\n\x87\n");
+        data.extend_from_slice(&[0x00, 0x00, 0x00, 0x14]);
+        data.extend_from_slice(b"ftypjxl \0\0\0\0jxl ");
+        data.extend_from_slice(&(8u32 + 100_000).to_be_bytes());
+        data.extend_from_slice(b"Exif");
+        data.extend_from_slice(&[0u8; 100_000]);
+        data.extend_from_slice(&[0x00, 0x00, 0x00, 0x0C]);
+        data.extend_from_slice(b"jxlc");
+        data.extend_from_slice(&[0xFF, 0x0A, 0x41, 0x02]);
+
+        let mut file = NamedTempFile::new().expect("Failed to create temporary file");
+        file.write_all(&data).expect("Failed to write to file");
+        let lossless = jxl::is_lossless_from_file(file.path()).expect("header should parse");
+        assert!(!lossless, "all_default header is xyb-encoded (lossy)");
+        assert_eq!(
+            lossless,
+            jxl::is_lossless_from_bytes(&data, file.path()).unwrap()
+        );
+
+        // A jbrd box anywhere means JPEG reconstruction data → lossless.
+        let mut with_jbrd = data.clone();
+        with_jbrd.extend_from_slice(&[0x00, 0x00, 0x00, 0x0A]);
+        with_jbrd.extend_from_slice(b"jbrd\0\0");
+        file.write_all(&with_jbrd[data.len()..]).unwrap();
+        assert!(jxl::is_lossless_from_file(file.path()).unwrap());
+
+        // The cases below sit behind signature, ftyp and a padding box that pushes the
+        // file past the probe size, so the file path walks box headers rather than
+        // handing the whole file to the bytes path.
+        let padded = |boxes: &[&[u8]]| {
+            let mut d = data[..32].to_vec();
+            d.extend_from_slice(&(8u32 + 5_000).to_be_bytes());
+            d.extend_from_slice(b"free");
+            d.resize(d.len() + 5_000, 0);
+            boxes.iter().for_each(|b| d.extend_from_slice(b));
+            d
+        };
+        let both_paths = |d: &[u8]| {
+            let mut file = NamedTempFile::new().expect("Failed to create temporary file");
+            file.write_all(d).expect("Failed to write to file");
+            (
+                jxl::is_lossless_from_file(file.path()).ok(),
+                jxl::is_lossless_from_bytes(d, file.path()).ok(),
+            )
+        };
+        let lossless_jxlc: &[u8] = b"\0\0\0\x0Djxlc\xFF\x0A\x41\0\0";
+        let lossy_jxlc: &[u8] = b"\0\0\0\x0Cjxlc\xFF\x0A\x41\x02";
+        let cases: [(&str, &[&[u8]], Option<bool>); 6] = [
+            // both paths use the first jxlc
+            ("two jxlc", &[lossless_jxlc, lossy_jxlc], Some(true)),
+            // a first jxlp with nothing past its part index is not skipped for a later part
+            (
+                "short first jxlp",
+                &[
+                    b"\0\0\0\x0Cjxlp\0\0\0\0",
+                    b"\0\0\0\x11jxlp\x80\0\0\x01\xFF\x0A\x41\0\0",
+                ],
+                None,
+            ),
+            // size < 8 skips 8 bytes
+            (
+                "size below 8",
+                &[b"\0\0\0\x04bad!", lossless_jxlc],
+                Some(true),
+            ),
+            // extended size < 16 skips 16 bytes
+            (
+                "extended size below 16",
+                &[b"\0\0\0\x01bad!\0\0\0\0\0\0\0\x08", lossy_jxlc],
+                Some(false),
+            ),
+            // extended size past the end of file: jbrd scan stops, jxlc scan skips 16
+            (
+                "extended size past end",
+                &[b"\0\0\0\x01big!\x7F\0\0\0\0\0\0\0", lossy_jxlc],
+                Some(false),
+            ),
+            // jbrd counts even when its box is truncated
+            (
+                "truncated jbrd",
+                &[lossy_jxlc, b"\0\0\0\x40jbrd\0\0"],
+                Some(true),
+            ),
+        ];
+        for (name, boxes, expected) in cases {
+            let (from_file, from_bytes) = both_paths(&padded(boxes));
+            assert_eq!(from_bytes, expected, "{name}: bytes path");
+            assert_eq!(from_file, from_bytes, "{name}: file path disagrees");
+        }
+
+        // A jbrd nested inside another box is only found by the bytes path's descent
+        // into payloads; a file within the probe size is decided by that path.
+        let mut nested = data[..32].to_vec();
+        nested.extend_from_slice(b"\0\0\0\x12uuid\0\0\0\x0Ajbrd\0\0");
+        nested.extend_from_slice(lossy_jxlc);
+        assert_eq!(both_paths(&nested), (Some(true), Some(true)));
+    }
+
+    #[test]
+    fn test_jxl_is_lossless_from_file_header_in_probe_bytes() {
+        // jxlc right after ftyp with a large payload: header is parsed from the
+        // initial probe read even though the 4 KiB window runs past it.
+        let mut data: Vec<u8> = vec![0x00, 0x00, 0x00, 0x0C];
+        data.extend_from_slice(b"JXL \r\n\x87\n");
+        data.extend_from_slice(&[0x00, 0x00, 0x00, 0x14]);
+        data.extend_from_slice(b"ftypjxl \0\0\0\0jxl ");
+        data.extend_from_slice(&(8u32 + 10_000).to_be_bytes());
+        data.extend_from_slice(b"jxlc");
+        data.extend_from_slice(&[0xFF, 0x0A, 0x41, 0x00, 0x00]);
+        data.resize(data.len() + 10_000 - 5, 0);
+
+        let mut file = NamedTempFile::new().expect("Failed to create temporary file");
+        file.write_all(&data).expect("Failed to write to file");
+        assert!(jxl::is_lossless_from_file(file.path()).unwrap());
+        assert!(jxl::is_lossless_from_bytes(&data, file.path()).unwrap());
+    }
+
     #[test]
     fn test_error_handling_nonexistent_file() {
         let path = std::path::Path::new("/nonexistent/file.test");
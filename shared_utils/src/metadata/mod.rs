@@ -646,7 +646,7 @@ fn merge_xmp_sidecar(src: &Path, dst: &Path) {
     }
 }
 
-fn find_xmp_sidecar(src: &Path) -> Option<std::path::PathBuf> {
+pub(crate) fn find_xmp_sidecar(src: &Path) -> Option<std::path::PathBuf> {
     if let Some(ext) = src.extension() {
         let xmp_full = src.with_extension(format!("{}.xmp", ext.to_str()?));
         if xmp_full.exists() {